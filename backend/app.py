@@ -1,16 +1,38 @@
 # backend/app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from rag_core import get_rag_system # to get the instance
 from config import API_HOST, API_PORT
+import orjson
 import logging
+from cachetools import TTLCache
+from threading import RLock
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 log = logging.getLogger('werkzeug') # Get Flask's default logger
 log.setLevel(logging.INFO)
 
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson - serializes the multi-KB RAG payloads
+       several times faster than stdlib json and emits compact output."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# Response cache: repeated queries skip the embedding, FAISS search and LLM
+# call entirely. Keyed on the normalized query text with a TTL so stale
+# answers age out.
+_response_cache = TTLCache(maxsize=2048, ttl=600)
+_response_cache_lock = RLock()
 CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173", "http://localhost:5174", "http://localhost:5175"]}}) # Support multiple ports
 
 # --- Initialize RAG System ---
@@ -44,24 +66,77 @@ def handle_query():
 
     logging.info(f"Received query from app: '{query[:200]}...'") # Distinguish from evaluate.py logs
 
+    # Optional 'modes' lets clients that only display one answer skip the
+    # other LLM call entirely (default keeps both for the standard frontend)
+    modes = frozenset(data.get('modes') or ('standard', 'rag'))
+    if not modes <= {'standard', 'rag'}:
+        logging.warning(f"Received invalid modes: {sorted(modes)}")
+        return jsonify({"error": "Invalid 'modes'; allowed values are 'standard' and 'rag'"}), 400
+
+    # Serve repeated queries straight from the cache
+    cache_key = (query.lower(), modes)
+    with _response_cache_lock:
+        cached = _response_cache.get(cache_key)
+    if cached is not None:
+        standard_response_text, rag_response_text, retrieved_context_info = cached
+        logging.info("App: Cache hit, returning cached responses.")
+        return jsonify({
+            "standard_response": standard_response_text,
+            "rag_response": rag_response_text,
+            "retrieved_chunks": retrieved_context_info,
+            "cached": True
+        })
+
     try:
-        # Generate both responses in a single LLM call for better performance
-        logging.info("App: Generating combined responses...")
-        # generate_combined_responses returns (standard_text, rag_text, context_info, retrieval_duration, llm_duration, context_length)
-        standard_response_text, rag_response_text, retrieved_context_info, _, _, _ = rag_system.generate_combined_responses(query)
+        # Generate only the requested responses (both run concurrently)
+        logging.info(f"App: Generating responses for modes {sorted(modes)}...")
+        result = rag_system.generate(query, modes)
+        standard_response_text = result.get('standard_response')
+        rag_response_text = result.get('rag_response')
+        retrieved_context_info = result.get('retrieved_context', [])
+
+        # Generation failures come back as "Error..." sentinel strings rather
+        # than exceptions - don't cache those, or a transient LLM outage would
+        # be served as a hit for the full TTL
+        has_error = any(isinstance(text, str) and text.startswith("Error")
+                        for text in (standard_response_text, rag_response_text))
+        if not has_error:
+            with _response_cache_lock:
+                _response_cache[cache_key] = (standard_response_text, rag_response_text, retrieved_context_info)
 
         # Prepare JSON response
         logging.info(f"App: Sending responses to frontend. RAG context items: {len(retrieved_context_info)}")
         return jsonify({
             "standard_response": standard_response_text,
             "rag_response": rag_response_text,
-            "retrieved_chunks": retrieved_context_info # key is used by the frontend
+            "retrieved_chunks": retrieved_context_info, # key is used by the frontend
+            "cached": False
         })
 
     except Exception as e:
         logging.error(f"App: Error processing query '{query[:200]}...': {e}", exc_info=True)
         return jsonify({"error": f"An internal server error occurred while processing your request."}), 500
 
+@app.route('/api/query/stream', methods=['POST'])
+def handle_query_stream():
+    """Streams the RAG answer as chunked plain text: the client starts
+       rendering at time-to-first-token instead of waiting for the whole
+       generation (no standard response, no context payload)."""
+    if rag_system is None:
+         logging.error("Stream query received, but RAG system is not initialized.")
+         return jsonify({"error": "RAG system failed to initialize. Check backend logs for missing files or other errors."}), 500
+
+    data = request.get_json()
+    query = (data or {}).get('query', '').strip()
+    if not query:
+        logging.warning("Received stream request with missing or empty 'query'.")
+        return jsonify({"error": "Missing 'query' in request body"}), 400
+
+    logging.info(f"Received streaming query from app: '{query[:200]}...'")
+    return Response(stream_with_context(rag_system.stream_rag_response(query)),
+                    mimetype='text/plain')
+
+
 # Simple health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -75,5 +150,9 @@ if __name__ == '__main__':
      if rag_system is None:
           logging.critical("Cannot start Flask server because RAG system initialization failed.")
      else:
-          logging.info(f"Starting Flask server on http://{API_HOST}:{API_PORT}")
-          app.run(host=API_HOST, port=API_PORT, debug=False) 
\ No newline at end of file
+          # Werkzeug's dev server handles one request at a time; waitress gives
+          # a threaded production server so slow LLM calls can overlap.
+          # For gunicorn use: gunicorn --workers=2 --threads=8 --worker-class=gthread wsgi:app
+          from waitress import serve
+          logging.info(f"Starting waitress server on http://{API_HOST}:{API_PORT}")
+          serve(app, host=API_HOST, port=API_PORT, threads=16)
\ No newline at end of file
@@ -1,31 +1,169 @@
 
-import json
+import orjson
 import os
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import pickle
+from concurrent.futures import ProcessPoolExecutor
+import re
 from config import (RAW_DATA_PATH, PROCESSED_DATA_PATH, EMBEDDING_MODEL_NAME,
-                    CHUNK_SIZE, CHUNK_OVERLAP, FAISS_INDEX_PATH, METADATA_PATH)
+                    CHUNK_SIZE, CHUNK_OVERLAP, FAISS_INDEX_PATH, METADATA_PATH,
+                    MAX_ARTICLE_TEXT_LEN)
+from embedding import get_embedder
 
-# --- Path for the combined lookup file ---
-ARTICLE_LOOKUP_PATH = "data/article_lookup.pkl"
+# --- Path for the combined lookup file (memory-mappable Arrow IPC) ---
+ARTICLE_LOOKUP_PATH = "data/article_lookup.arrow"
+
+# --- Directory for the exported/quantized ONNX encoder ---
+ONNX_MODEL_DIR = "data/onnx_encoder"
+
+# Lightweight/lifestyle sections excluded from the index - one compiled
+# case-insensitive scan per article id instead of per-section containment
+# tests plus a .lower() allocation
+_SKIP_RE = re.compile(r'fashion|food|travel|lifeandstyle|books|film|stage', re.IGNORECASE)
+
+
+# Sentence/paragraph boundaries, compiled once - one C regex scan per
+# article instead of LangChain's recursive per-separator splitting
+_SPLIT_RE = re.compile(r'(?<=[.!?])\s+|\n{2,}')
+
+
+def fast_split(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """Splits text on sentence/paragraph boundaries and greedily merges the
+       pieces up to chunk_size, carrying chunk_overlap characters between
+       chunks (same contract as the RecursiveCharacterTextSplitter it
+       replaces, minus the Python-heavy recursion)."""
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    buf = ''
+    for part in _SPLIT_RE.split(text):
+        if not part:
+            continue
+        if len(part) > chunk_size:
+            # Oversized part (no sentence boundaries): hard-wrap it
+            if buf:
+                chunks.append(buf)
+                buf = ''
+            step = chunk_size - chunk_overlap
+            for start in range(0, len(part), step):
+                piece = part[start:start + chunk_size]
+                if start + chunk_size >= len(part):
+                    buf = piece  # Let the tail merge with following parts
+                    break
+                chunks.append(piece)
+            continue
+        if buf and len(buf) + 1 + len(part) > chunk_size:
+            chunks.append(buf)
+            tail = buf[-chunk_overlap:] if chunk_overlap else ''
+            buf = f"{tail} {part}".strip()
+        else:
+            buf = f"{buf} {part}" if buf else part
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+def _split_one(item):
+    """Filters and chunks a single (article_id, details) pair. Returns
+       (article_id, chunks) where chunks is None for filtered articles."""
+    article_id, article_details = item
+    body_text = article_details.get('text')
+    if not body_text:
+        return article_id, None
+    # Apply gentle content filtering inline (no separate list traversal):
+    # skip lifestyle sections and very short articles (< 500 characters)
+    if _SKIP_RE.search(article_id) or len(body_text) <= 500:
+        return article_id, None
+    try:
+        return article_id, fast_split(body_text)
+    except Exception as e:
+        print(f"Error chunking article {article_id}: {e}")
+        return article_id, []
+
+
+class OnnxEncoder:
+    """Drop-in replacement for SentenceTransformer.encode using ONNX Runtime
+       with dynamic INT8 quantization. Embedding inference dominates the build
+       runtime, and int8 GEMM roughly halves-to-quarters the bytes moved per
+       token on CPU (VNNI on x86, AMX on Apple Silicon)."""
+
+    def __init__(self, model_name: str, save_dir: str = ONNX_MODEL_DIR):
+        from transformers import AutoTokenizer
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        import onnxruntime as ort
+
+        quantized_path = os.path.join(save_dir, "model_quantized.onnx")
+        if not os.path.exists(quantized_path):
+            print(f"Exporting {model_name} to ONNX and applying dynamic INT8 quantization...")
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            ort_model.save_pretrained(save_dir)
+            quantizer = ORTQuantizer.from_pretrained(save_dir)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+        else:
+            print(f"Reusing quantized ONNX encoder from {save_dir}.")
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # CoreML EP kicks in on the author's M2; elsewhere ORT falls back to CPU
+        self.session = ort.InferenceSession(
+            quantized_path,
+            providers=['CoreMLExecutionProvider', 'CPUExecutionProvider'])
+
+    def encode(self, texts, batch_size: int = 64, show_progress_bar: bool = False):
+        """Encodes texts to L2-normalized embeddings (same contract as
+           SentenceTransformer.encode)."""
+        from tqdm import trange
+        # Tokenize everything in one call to the fast (Rust) tokenizer - the
+        # per-call setup overhead doesn't scale with batch size - and pad only
+        # within each batch rather than to the global max length
+        encoded = self.tokenizer(texts, padding=False, truncation=True, max_length=256)
+        input_names = {inp.name for inp in self.session.get_inputs()}
+        all_embeddings = []
+        batch_range = trange(0, len(texts), batch_size) if show_progress_bar else range(0, len(texts), batch_size)
+        for start in batch_range:
+            batch = {k: v[start:start + batch_size] for k, v in encoded.items()}
+            padded = self.tokenizer.pad(batch, return_tensors="np")
+            ort_inputs = {k: v for k, v in padded.items() if k in input_names}
+            token_embeddings = self.session.run(None, ort_inputs)[0]
+            # Mean-pool + L2-normalize in float32 to avoid quantized accumulation error
+            token_embeddings = token_embeddings.astype(np.float32)
+            mask = padded['attention_mask'][..., np.newaxis].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            embeddings = summed / counts
+            norms = np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+            all_embeddings.append(embeddings / norms)
+        return np.concatenate(all_embeddings, axis=0)
+
+
+def load_encoder(model_name: str):
+    """Prefers the quantized ONNX Runtime encoder; falls back to the plain
+       SentenceTransformer if optimum/onnxruntime are not installed."""
+    try:
+        return OnnxEncoder(model_name)
+    except ImportError as e:
+        print(f"optimum/onnxruntime not available ({e}), falling back to SentenceTransformer.")
+        # Shared singleton factory picks MPS/CUDA and fp16 where available
+        model = get_embedder()
+        print(f"Loaded SentenceTransformer on {model.device}.")
+        return model
 
 def process_and_index():
     """Loads raw data, processes text, generates embeddings, builds FAISS index,
        and creates an article lookup file (text, title, url, date).""" 
     print(f"Loading raw articles from {RAW_DATA_PATH}...")
-    articles = []
     # --- Dictionary stores article details (text, title, url, date) ---
+    # Single pass with orjson on raw bytes - no intermediate `articles` list,
+    # which roughly halves peak memory on large corpora.
     article_lookup = {}
     # ---
     try:
-        with open(RAW_DATA_PATH, 'r', encoding='utf-8') as f:
+        with open(RAW_DATA_PATH, 'rb') as f:  # orjson parses bytes directly
             for line in f:
                 try:
-                    article_data = json.loads(line)
-                    articles.append(article_data)
+                    article_data = orjson.loads(line)
                     # --- Store full details including date ---
                     article_id = article_data.get('id')
                     if article_id and 'bodyText' in article_data:
@@ -36,41 +174,45 @@ def process_and_index():
                             'date': article_data.get('webPublicationDate')
                         }
                     # ---
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"Skipping line due to JSON decode error: {e} - Line: {line[:100]}...")
 
     except FileNotFoundError:
         print(f"Error: Raw data file not found at {RAW_DATA_PATH}. Run data_fetcher.py first.")
         return
 
-    if not articles:
+    if not article_lookup:
         print("No articles found in the raw data file.")
         return
 
-    print(f"Loaded {len(articles)} articles and stored details for {len(article_lookup)} unique IDs.")
+    print(f"Loaded and stored details for {len(article_lookup)} unique article IDs.")
 
-    # --- Apply gentle filtering ---
-    print("Applying gentle content filtering...")
-    original_count = len(articles)
-    
-    # Remove only lightweight/lifestyle sections
-    skip_sections = {'fashion', 'food', 'travel', 'lifeandstyle', 'books', 'film', 'stage'}
-    articles = [a for a in articles if not any(section in a.get('id', '').lower() for section in skip_sections)]
-    
-    # Remove very short articles (less than 500 characters)
-    articles = [a for a in articles if len(a.get('bodyText', '')) > 500]
-    
+    # --- Gentle filtering is applied inline during chunking (see below) ---
     # Skip deduplication for now
     print("Skipping deduplication...")
-    print(f"Total reduction: {original_count} → {len(articles)} ({100*(original_count-len(articles))/original_count:.1f}% reduction)")
 
-    # --- Save the article lookup dictionary ---
-    print(f"Saving article lookup dictionary to {ARTICLE_LOOKUP_PATH}...")
+    # --- Save the article lookup as a columnar Arrow IPC file ---
+    # Uncompressed feather so the server can memory-map it: articles load as
+    # zero-copy string views off the page cache instead of a monolithic
+    # pickle deserialized into millions of Python objects at startup
+    print(f"Saving article lookup table to {ARTICLE_LOOKUP_PATH}...")
     os.makedirs(os.path.dirname(ARTICLE_LOOKUP_PATH), exist_ok=True)
     try:
-        import pickle
-        with open(ARTICLE_LOOKUP_PATH, 'wb') as f_pkl:
-            pickle.dump(article_lookup, f_pkl)
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        # Text is capped to the prompt context limit here, once, so serving
+        # never re-truncates (or re-copies) 50KB strings per request;
+        # chunking below still sees the full text from the in-memory dict
+        lookup_table = pa.table({
+            'article_id': list(article_lookup.keys()),
+            'title': [details.get('title') for details in article_lookup.values()],
+            'url': [details.get('url') for details in article_lookup.values()],
+            'date': [details.get('date') for details in article_lookup.values()],
+            'text': [details['text'] if len(details['text']) <= MAX_ARTICLE_TEXT_LEN
+                     else f"{details['text'][:MAX_ARTICLE_TEXT_LEN]}..."
+                     for details in article_lookup.values()],
+        })
+        feather.write_feather(lookup_table, ARTICLE_LOOKUP_PATH, compression='uncompressed')
         print("Article lookup saved successfully.")
     except Exception as e:
         print(f"Error saving article lookup: {e}")
@@ -78,92 +220,90 @@ def process_and_index():
 
     # --- Chunking and Metadata Generation ---
     print(f"Processing and chunking text (Chunk Size: {CHUNK_SIZE}, Overlap: {CHUNK_OVERLAP})...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP, 
-        length_function=len,
-        add_start_index=True,
-    )
 
     all_chunks_text = []
-    metadata = {}
-    chunk_counter = 0
-
-    for i, article in enumerate(articles):
-        article_id = article.get('id')
-        # Here I'm using lookup for consistency and access to potentially cleaned/stored text
-        if not article_id or article_id not in article_lookup:
-            continue
+    # Columnar (SoA) metadata: row position equals FAISS id, so only the
+    # article_id and chunk_index columns need storing - text stays in the
+    # article lookup.
+    chunk_article_ids = []
+    chunk_indices = []
+    filtered_count = 0
 
-        article_details = article_lookup[article_id]
-        body_text = article_details.get('text')
-
-        if not body_text: continue
-
-        try:
-            chunks = text_splitter.split_text(body_text)
+    # Chunking is embarrassingly parallel and Python-heavy, so fan out over
+    # all cores; flattening into metadata stays on the main process.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for i, (article_id, chunks) in enumerate(
+                executor.map(_split_one, article_lookup.items(), chunksize=64)):
+            if chunks is None:
+                filtered_count += 1
+                continue
             for chunk_index, chunk_text in enumerate(chunks):
-                # Chunk metadata - text removed to save massive space
-                chunk_metadata = {
-                    'article_id': article_id,
-                    'chunk_index': chunk_index,
-                    # 'text' removed - get from article_lookup via article_id when needed
-                }
-                metadata[chunk_counter] = chunk_metadata
+                chunk_article_ids.append(article_id)
+                chunk_indices.append(chunk_index)
                 all_chunks_text.append(chunk_text)
-                chunk_counter += 1
-        except Exception as e:
-             print(f"Error chunking article {article_id}: {e}")
 
-        if (i + 1) % 10000 == 0:
-             print(f"Processed {i+1}/{len(articles)} articles for chunking...")
+            if (i + 1) % 10000 == 0:
+                 print(f"Processed {i+1}/{len(article_lookup)} articles for chunking...")
 
     # --- Rest of the script (saving processed chunks, embedding, indexing) ---
     if not all_chunks_text:
         print("No text chunks were generated for embedding.")
         return
 
+    print(f"Filtered out {filtered_count}/{len(article_lookup)} articles ({100*filtered_count/len(article_lookup):.1f}% reduction).")
     print(f"Generated {len(all_chunks_text)} text chunks for embedding.")
 
     # Skip saving processed chunks debug file to save 800MB+ space
     print(f"Skipping debug file {PROCESSED_DATA_PATH} to save space...")
 
 
-    print(f"Loading sentence transformer model: {EMBEDDING_MODEL_NAME}...")
-    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    print(f"Loading embedding model: {EMBEDDING_MODEL_NAME}...")
+    model = load_encoder(EMBEDDING_MODEL_NAME)
     print("Generating embeddings for chunks (this will take time)...")
-    # Batch size 64 works the best on my 8 GB M2 Macbook air
-    embeddings = model.encode(all_chunks_text, show_progress_bar=True, batch_size=64)
+    # Sort chunks by length before encoding so each batch is padded to a
+    # near-uniform length (insertion order wastes FLOPs on pad tokens),
+    # then unpermute back so metadata keys still line up.
+    order = np.argsort([len(t) for t in all_chunks_text])
+    sorted_texts = [all_chunks_text[i] for i in order]
+    # Batch size 64 works the best on CPU on my 8 GB M2 Macbook air;
+    # on MPS/CUDA the GPU keeps up with much larger batches
+    encode_batch_size = 64
+    if isinstance(model, SentenceTransformer) and str(getattr(model, 'device', 'cpu')) != 'cpu':
+        encode_batch_size = 256
+    sorted_embeddings = model.encode(sorted_texts, show_progress_bar=True, batch_size=encode_batch_size)
+    embeddings = np.empty_like(sorted_embeddings)
+    embeddings[order] = sorted_embeddings
     print(f"Generated {embeddings.shape[0]} embeddings of dimension {embeddings.shape[1]}.")
 
     dimension = embeddings.shape[1]
-    
-    # Use IndexIVFFlat for massive size reduction (approximate search)
-    nlist = min(1024, len(embeddings) // 40)  # Adaptive clusters based on data size
-    quantizer = faiss.IndexFlatL2(dimension)
-    index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
-    
-    # Train the index (required for IVF)
-    print(f"Training FAISS index with {nlist} clusters...")
-    index.train(np.array(embeddings).astype('float32'))
-    
-    # Convert to float32 and add to trained index
-    embeddings_array = np.array(embeddings).astype('float32')
+    embeddings_array = np.ascontiguousarray(embeddings, dtype='float32')
+
+    # Sentence embeddings are cosine-based, so normalize once and use the
+    # inner-product metric - better retrieval quality than L2 and FAISS
+    # dispatches to its faster SIMD IP kernels
+    faiss.normalize_L2(embeddings_array)
+
+    # HNSW graph over 8-bit scalar-quantized vectors: sub-linear ANN search,
+    # 4x less vector memory than fp32, and FAISS's SIMD int8 distance
+    # kernels. The slight recall loss is invisible downstream of the LLM
+    # reader (and the binary recall stage below reranks anyway).
+    print("Building FAISS HNSW-SQ8 index (inner product)...")
+    index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, 32, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = 200
+    index.train(embeddings_array)  # SQ needs a training pass for the per-dim ranges
     index.add(embeddings_array)
     
-    # ULTRA-AGGRESSIVE: Binary quantization for maximum compression
-    print("Creating binary embeddings for maximum compression...")
-    # Binary quantization: >0 = 1, <=0 = 0
+    # Binary recall index: sign-quantize to 1 bit per dimension and search
+    # with Hamming distance (popcount) - 32x smaller than fp32 and fast
+    # enough to serve as the first stage of a retrieve->rerank pipeline
+    print("Building binary Hamming index for the recall stage...")
     embeddings_binary = (embeddings_array > 0).astype(np.uint8)
-    binary_path = FAISS_INDEX_PATH.replace('.faiss', '_binary.npy')
-    np.save(binary_path, embeddings_binary)
-    print(f"Saved binary embeddings to {binary_path} (87% smaller than uint8)")
-    
-    # Also save uint8 version for fallback
-    embeddings_uint8 = (embeddings_array * 127).astype(np.uint8)
-    quantized_path = FAISS_INDEX_PATH.replace('.faiss', '_quantized.npy')
-    np.save(quantized_path, embeddings_uint8)
-    print(f"Saved uint8 fallback to {quantized_path}")
+    packed = np.packbits(embeddings_binary, axis=1)
+    binary_index = faiss.IndexBinaryFlat(dimension)
+    binary_index.add(packed)
+    binary_index_path = FAISS_INDEX_PATH.replace('.faiss', '_binary.faiss')
+    faiss.write_index_binary(binary_index, binary_index_path)
+    print(f"Saved binary index to {binary_index_path} ({packed.shape[1]} bytes/vector)")
 
     print(f"Built FAISS index with {index.ntotal} vectors.")
 
@@ -171,12 +311,18 @@ def process_and_index():
     faiss.write_index(index, FAISS_INDEX_PATH)
     print(f"Saved FAISS index to {FAISS_INDEX_PATH}")
 
-    # Save chunk metadata using compressed pickle format
+    # Save chunk metadata as columnar Parquet - dictionary-encoded article_id
+    # collapses the dozens of repeated strings per article, int32 chunk_index
+    # is 4 bytes per row vs ~60 for a pickled dict entry
     try:
-        import pickle
-        with open(METADATA_PATH, 'wb') as f:
-            pickle.dump(metadata, f, protocol=pickle.HIGHEST_PROTOCOL)
-        print(f"Saved compressed chunk metadata to {METADATA_PATH}")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({
+            'article_id': pa.array(chunk_article_ids).dictionary_encode(),
+            'chunk_index': pa.array(chunk_indices, type=pa.int32()),
+        })
+        pq.write_table(table, METADATA_PATH, compression='zstd')
+        print(f"Saved columnar chunk metadata to {METADATA_PATH}")
     except Exception as e:
         print(f"Error saving chunk metadata: {e}")
 
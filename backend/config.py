@@ -19,10 +19,15 @@ EMBEDDING_MODEL_NAME = 'paraphrase-MiniLM-L3-v2'  # 384→128 dims (66% smaller)
 CHUNK_SIZE = 3072
 CHUNK_OVERLAP = 128
 FAISS_INDEX_PATH = "data/news_index.faiss"
-METADATA_PATH = "data/metadata.pkl" # Mapping FAISS index to chunk info (compressed)
+# OpenMP threads for FAISS search. 1 avoids thread-fork overhead on
+# single-vector queries (the common case); raise towards the core count if
+# the search micro-batcher regularly coalesces large batches under load.
+FAISS_NUM_THREADS = int(os.getenv("FAISS_NUM_THREADS", 1))
+METADATA_PATH = "data/metadata.parquet" # Mapping FAISS index to chunk info (columnar)
 
 # --- RAG ---
 RETRIEVAL_K = 5 # Number of chunks to retrieve
+MAX_ARTICLE_TEXT_LEN = 50000 # Character limit per article in RAG prompt context (applied at build time)
 
 # --- LLM ---
 GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -0,0 +1,38 @@
+# backend/embedding.py
+import os
+from functools import lru_cache
+
+import torch
+from sentence_transformers import SentenceTransformer
+
+from config import EMBEDDING_MODEL_NAME
+
+
+def _pick_device() -> str:
+    """MPS on Apple Silicon, CUDA where available, otherwise CPU."""
+    if torch.backends.mps.is_available():
+        return 'mps'
+    if torch.cuda.is_available():
+        return 'cuda'
+    return 'cpu'
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> SentenceTransformer:
+    """Loads the embedding model exactly once per process and returns the
+       shared instance: inference-only weights, fp16 on GPU. Under gunicorn
+       --preload the parent loads it pre-fork so workers share one read-only
+       copy via copy-on-write instead of ~500 MB each."""
+    device = _pick_device()
+    if device == 'cpu':
+        # Torch defaults to a conservative intra-op thread count; pin it to
+        # the machine so the CPU fallback uses every core for the matmuls
+        torch.set_num_threads(os.cpu_count() or 1)
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+    if device != 'cpu':
+        # fp16 halves bandwidth per weight on GPU
+        model = model.half()
+    return model
@@ -1,31 +1,262 @@
 # backend/rag_core.py
 import faiss
-import json
+import io
+import orjson
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from google import genai
 from google.genai import types
-import pickle
 import os
 import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
 import re # For parsing LLM Eval JSON
 from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from config import (FAISS_INDEX_PATH, METADATA_PATH, EMBEDDING_MODEL_NAME,
-                    RETRIEVAL_K, GEMINI_API_KEY, GEMINI_MODEL_NAME) # Base model
+                    RETRIEVAL_K, GEMINI_API_KEY, GEMINI_MODEL_NAME,
+                    MAX_ARTICLE_TEXT_LEN, FAISS_NUM_THREADS) # Base model
+from embedding import get_embedder
 import logging
 
 # --- Basic Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__) 
 
-ARTICLE_LOOKUP_PATH = "data/article_lookup.pkl"
+ARTICLE_LOOKUP_PATH = "data/article_lookup.arrow"
+
+# Compiled once: locates the opening of a fenced code block in LLM output
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*', re.IGNORECASE)
+
+
+def _extract_json_span(raw_text: str, open_char: str = '{', close_char: str = '}') -> "str | None":
+    """Returns the first balanced JSON object (or array, with '['/']') in
+       raw_text, starting from a markdown fence when one is present. Single
+       forward scan tracking bracket depth - string- and escape-aware - so
+       there is no backtracking regex or rfind over trailing prose."""
+    fence = _JSON_FENCE_RE.search(raw_text)
+    start = raw_text.find(open_char, fence.end() if fence else 0)
+    if start == -1 and fence:
+        start = raw_text.find(open_char)
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(raw_text)):
+        char = raw_text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return raw_text[start:i + 1]
+    return None
 
 # --- Constants ---
 NUM_FULL_ARTICLES_TO_USE = 7 # Number of full articles to provide as context
 RETRIEVE_MULTIPLIER = 2 # Retrieve initial_k = NUM_FULL_ARTICLES_TO_USE * RETRIEVE_MULTIPLIER chunks
 EVALUATOR_LLM_MODEL_NAME = "gemini-1.5-pro-latest" # LLM for evaluation
-MAX_ARTICLE_TEXT_LEN = 50000 # Character limit per article in RAG prompt context
+# Accepted groundedness_to_source values: one hash lookup instead of the
+# isinstance + range + string comparison chain
+_VALID_GROUNDED = frozenset((1, 2, 3, 4, 5, "N/A"))
+
+
+@dataclass(slots=True)
+class EvaluationResult:
+    """One evaluator verdict. A slotted dataclass instead of a nested dict:
+       fixed attribute storage rather than a per-verdict hash table, and
+       orjson serializes dataclasses natively so the results write path in
+       evaluate.py is unchanged. Exactly one of the score fields or error
+       is populated."""
+    standard_scores: dict | None = None
+    rag_scores: dict | None = None
+    comparative_summary: str | None = None
+    error: str | None = None
+
+# Evaluator prompt, split at its three insertion points (query, standard
+# response, RAG response) into constant fragments built once at import. Each
+# call then assembles the ~2KB prompt with a single join instead of
+# re-materializing the static text through an f-string.
+_EVAL_PROMPT_HEAD = """You are an expert evaluator assessing the quality of two AI-generated answers (Standard vs. RAG) to a query about events/topics from the year 2015. The RAG response had access to 2015 news articles.
 
+**Task:** Evaluate both responses on the criteria below (1=Very Poor, 5=Excellent), focusing *only* on the 2015 context. Output **only** a valid JSON object adhering strictly to the specified format. Scores must be integers between 1 and 5.
+
+**Criteria:**
+1.  **Relevance (1-5):** How directly does the response address the specific query?
+2.  **Factual Accuracy (2015 Context) (1-5):** Accuracy of info *about 2015*? (Ignore other periods).
+3.  **Specificity/Detail (2015 Context) (1-5):** Richness in specific 2015 details (names, dates, figures, etc.)?
+4.  **Groundedness (RAG Only) (1-5):** Does the RAG response seem based on plausible 2015 sources? Score 1 (generic) to 5 (source-based). Assign "N/A" (as a string) for Standard.
+5.  **Temporal Accuracy (1-5):** Does the response correctly stay within/reference the 2015 timeframe?
+6.  **Completeness (1-5):** How thoroughly does the response address all aspects of the query?
+7.  **Coherence/Readability (1-5):** How well-structured and clear is the response?
+8.  **Lack of Hallucination (2015 Context) (1-5):** How free from plausible but false info *about 2015*?
+
+**Query:**
+```text
+"""
+
+_EVAL_PROMPT_MID_STANDARD = """
+```
+
+**Standard LLM Response:**
+```text
+"""
+
+_EVAL_PROMPT_MID_RAG = """
+```
+
+**RAG LLM Response:**
+```text
+"""
+
+_EVAL_PROMPT_TAIL = """
+```
+**Instructions to Evaluator:**
+Return your ratings in the *exact* JSON format below (no extra keys, no comments):
+
+```json
+{
+  "standard_scores": {
+    "relevance": <score_int>,
+    "factual_accuracy_2015": <score_int>,
+    "specificity_2015": <score_int>,
+    "temporal_accuracy": <score_int>,
+    "completeness": <score_int>,
+    "coherence": <score_int>,
+    "lack_of_hallucination_2015": <score_int>
+  },
+  "rag_scores": {
+    "relevance": <score_int>,
+    "factual_accuracy_2015": <score_int>,
+    "specificity_2015": <score_int>,
+    "groundedness_to_source": <score_int_or_NA_string>,
+    "temporal_accuracy": <score_int>,
+    "completeness": <score_int>,
+    "coherence": <score_int>,
+    "lack_of_hallucination_2015": <score_int>
+  },
+  "comparative_summary": "<1–2 sentence comparison focusing on 2015 context>"
+}
+```"""
+
+
+class QueryEmbeddingBatcher:
+    """Coalesces query embeddings from concurrent request threads into a
+       single encode() forward pass. Each request submits its text and waits
+       on a Future; a background worker drains up to max_batch items (or
+       whatever arrives within max_wait_ms) and encodes them together, so
+       simultaneous queries stop paying for batch-size-1 matmuls."""
+
+    def __init__(self, embedder, max_batch: int = 32, max_wait_ms: float = 10.0):
+        self.embedder = embedder
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self._worker_thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queues a text for embedding; resolves to a (1, dim) float32 array."""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.embedder.encode(texts, convert_to_numpy=True).astype('float32')
+                for i, (_, future) in enumerate(batch):
+                    future.set_result(embeddings[i:i + 1])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+class ChunkMetadata:
+    """Structure-of-arrays chunk metadata. Row position equals FAISS id, so
+       the whole metadata is two parallel columns - the int article code per
+       chunk plus the code -> article_id table - instead of a dict-of-dicts
+       with per-chunk object overhead."""
+    __slots__ = ('article_code', 'chunk_index', 'article_id_by_code')
+
+    def __init__(self, article_code: np.ndarray, chunk_index: np.ndarray,
+                 article_id_by_code: list[str]):
+        self.article_code = article_code
+        self.chunk_index = chunk_index
+        self.article_id_by_code = article_id_by_code
+
+    def __len__(self) -> int:
+        return len(self.article_code)
+
+
+class FaissSearchBatcher:
+    """Coalesces FAISS searches from concurrent request threads into a
+       single index.search call, the same way QueryEmbeddingBatcher batches
+       encode() passes. One (B, d) search amortizes the SIMD kernel launch
+       and memory bandwidth across queries instead of paying the n=1 cost
+       per request."""
+
+    def __init__(self, index, max_batch: int = 32, max_wait_ms: float = 5.0):
+        self.index = index
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self._worker_thread.start()
+
+    def submit(self, embedding: np.ndarray, k: int) -> Future:
+        """Queues a (1, d) embedding; resolves to its (distances, indices) rows."""
+        future = Future()
+        self._queue.put((embedding, k, future))
+        return future
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                embeddings = np.vstack([emb for emb, _, _ in batch])
+                # Search once at the widest k in the batch, then slice each
+                # caller's rows back down to its own k
+                k_max = max(k for _, k, _ in batch)
+                distances, indices = self.index.search(embeddings, k_max)
+                for i, (_, k, future) in enumerate(batch):
+                    future.set_result((distances[i:i + 1, :k], indices[i:i + 1, :k]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
 
 
 class RAGSystem:
@@ -49,21 +280,29 @@ class RAGSystem:
             logger.error(f"CRITICAL: Failed to configure Google GenAI client: {e}", exc_info=True)
             raise
 
-        # Initialize Generator LLM (2.5 Flash)
+        # Initialize Generator LLM (2.5 Flash). The Evaluator LLM is a lazy
+        # cached_property - only the offline evaluation script touches it,
+        # so serving workers never pay for its setup.
         self.generator_llm = self._initialize_llm(GEMINI_MODEL_NAME, "Generator")
 
-        # Initialize Evaluator LLM (Pro 1.5)
-        self.evaluator_llm = self._initialize_llm(EVALUATOR_LLM_MODEL_NAME, "Evaluator")
-
         # Load Embedding Model
         self.embedder = self._load_embedding_model()
 
-        # Load Article Lookup Data
-        self.article_lookup = self._load_pickle_data(ARTICLE_LOOKUP_PATH, "Article Lookup")
+        # Dynamic batcher so concurrent request threads share encode() passes
+        self.embedding_batcher = QueryEmbeddingBatcher(self.embedder)
+
+        # Load Article Lookup Data (memory-mapped Arrow table)
+        self.article_lookup = self._load_article_lookup()
 
         # Load FAISS Index
         self.index = self._load_faiss_index()
 
+        # Micro-batcher so concurrent request threads share index.search calls
+        self.search_batcher = FaissSearchBatcher(self.index)
+
+        # Load optional binary Hamming index for the fast recall stage
+        self.binary_index = self._load_binary_index()
+
         # Load Metadata
         self.metadata = self._load_metadata()
 
@@ -74,13 +313,29 @@ class RAGSystem:
 
         logger.info("RAG System Initialized Successfully.")
 
-    def _initialize_llm(self, model_name: str, llm_type: str) -> dict | None:
+    @cached_property
+    def evaluator_llm(self) -> dict | None:
+        """Evaluator LLM (Pro 1.5), initialized on first use. JSON mode makes
+           the model emit bare JSON, so parsing skips the fence scan."""
+        return self._initialize_llm(EVALUATOR_LLM_MODEL_NAME, "Evaluator", json_output=True)
+
+    def _initialize_llm(self, model_name: str, llm_type: str, json_output: bool = False) -> dict | None:
         """Initializes a Google Generative AI model client."""
         try:
-            # Store model name and client info for later use
+            # Store model name, client info, and generation config for later use.
+            # The config is built once here - 2.5-family models get thinking
+            # disabled, json_output requests structured JSON responses -
+            # instead of being reallocated on every call
+            config_kwargs = {}
+            if "2.5" in model_name:
+                config_kwargs['thinking_config'] = types.ThinkingConfig(thinking_budget=0)  # Disable thinking
+            if json_output:
+                config_kwargs['response_mime_type'] = "application/json"
+            generation_config = types.GenerateContentConfig(**config_kwargs) if config_kwargs else None
             model_config = {
                 'client': self.client,
-                'model_name': model_name
+                'model_name': model_name,
+                'config': generation_config
             }
             logger.info(f"Loaded {llm_type} LLM: {model_name}")
             return model_config
@@ -89,30 +344,39 @@ class RAGSystem:
             return None 
 
     def _load_embedding_model(self) -> SentenceTransformer:
-        """Loads the Sentence Transformer embedding model."""
+        """Loads the Sentence Transformer embedding model (process-wide singleton)."""
         try:
             logger.info(f"Loading embedding model: {EMBEDDING_MODEL_NAME}...")
-            embedder = SentenceTransformer(EMBEDDING_MODEL_NAME)
+            embedder = get_embedder()
             logger.info("Embedding model loaded.")
             return embedder
         except Exception as e:
             logger.error(f"CRITICAL: Failed to load embedding model {EMBEDDING_MODEL_NAME}: {e}", exc_info=True)
             raise RuntimeError(f"Could not load embedding model: {e}")
 
-    def _load_pickle_data(self, file_path: str, description: str) -> dict:
-        """Loads data from a pickle file."""
-        logger.info(f"Loading {description} from {file_path}...")
-        if not os.path.exists(file_path):
-            logger.error(f"CRITICAL: {description} file not found: {file_path}")
-            raise FileNotFoundError(f"{description} file missing. Run build_index.py again: {file_path}")
+    def _load_article_lookup(self) -> dict:
+        """Memory-maps the Arrow article lookup table and returns the
+           article_id -> row-position map. Startup only materializes the id
+           column; titles and full texts stay on disk as zero-copy string
+           views until an article is actually read, and gunicorn workers
+           share one page-cache copy of the file."""
+        logger.info(f"Loading Article Lookup from {ARTICLE_LOOKUP_PATH}...")
+        if not os.path.exists(ARTICLE_LOOKUP_PATH):
+            logger.error(f"CRITICAL: Article Lookup file not found: {ARTICLE_LOOKUP_PATH}")
+            raise FileNotFoundError(f"Article Lookup file missing. Run build_index.py again: {ARTICLE_LOOKUP_PATH}")
         try:
-            with open(file_path, 'rb') as f_pkl:
-                data = pickle.load(f_pkl)
-            logger.info(f"{description} loaded with {len(data)} items.")
-            return data
+            import pyarrow as pa
+            source = pa.memory_map(ARTICLE_LOOKUP_PATH, 'r')
+            table = pa.ipc.open_file(source).read_all().combine_chunks()
+            self._lookup_columns = {name: table.column(name).chunk(0)
+                                    for name in ('title', 'url', 'date', 'text')}
+            row_map = {article_id: row
+                       for row, article_id in enumerate(table.column('article_id').to_pylist())}
+            logger.info(f"Article Lookup loaded with {len(row_map)} items (memory-mapped).")
+            return row_map
         except Exception as e:
-            logger.error(f"CRITICAL: Error loading {description} from {file_path}: {e}", exc_info=True)
-            raise RuntimeError(f"Could not load {description} data: {e}")
+            logger.error(f"CRITICAL: Error loading Article Lookup from {ARTICLE_LOOKUP_PATH}: {e}", exc_info=True)
+            raise RuntimeError(f"Could not load Article Lookup data: {e}")
 
     def _load_faiss_index(self) -> faiss.Index:
         """Loads the FAISS index file."""
@@ -121,53 +385,161 @@ class RAGSystem:
             logger.error(f"CRITICAL: FAISS index file not found: {FAISS_INDEX_PATH}")
             raise FileNotFoundError(f"FAISS index missing. Run build_index.py again: {FAISS_INDEX_PATH}")
         try:
-            index = faiss.read_index(FAISS_INDEX_PATH)
-            logger.info(f"FAISS index loaded with {index.ntotal} vectors.")
+            # Memory-map the index: load is near-instant, the OS pages in only
+            # touched vectors, and gunicorn workers share one copy of the file
+            index = faiss.read_index(FAISS_INDEX_PATH, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            logger.info(f"FAISS index loaded (mmap) with {index.ntotal} vectors.")
+
+            # Pin the OpenMP pool: forking threads per single-vector search
+            # costs more than it saves (see FAISS_NUM_THREADS in config)
+            faiss.omp_set_num_threads(FAISS_NUM_THREADS)
+            logger.info(f"Set FAISS OpenMP threads to {FAISS_NUM_THREADS}.")
             if index.ntotal == 0: logger.warning("FAISS index is empty!")
-            
+
+            # Legacy flat indices do an exhaustive scan per query; rebuild
+            # them into HNSW once at load time when they are big enough for
+            # the graph search to pay off (build_index.py writes HNSW now)
+            if isinstance(index, faiss.IndexFlat) and index.ntotal > self.FLAT_INDEX_UPGRADE_THRESHOLD:
+                index = self._upgrade_flat_index(index)
+
             # Set nprobe for IVF indexes (controls search accuracy vs speed)
             if hasattr(index, 'nprobe'):
                 index.nprobe = min(32, index.nlist // 4)  # Good balance of speed/accuracy
                 logger.info(f"Set FAISS nprobe to {index.nprobe} for optimized search")
-            
+
+            # Set efSearch for HNSW indexes (search breadth vs latency)
+            if hasattr(index, 'hnsw'):
+                index.hnsw.efSearch = 64
+                logger.info("Set FAISS HNSW efSearch to 64 for optimized search")
+
             return index
         except Exception as e:
             logger.error(f"CRITICAL: Error loading FAISS index from {FAISS_INDEX_PATH}: {e}.", exc_info=True)
             raise RuntimeError(f"Could not load FAISS index: {e}")
 
-    def _load_metadata(self) -> dict:
-        """Loads and processes the chunk metadata file."""
+    FLAT_INDEX_UPGRADE_THRESHOLD = 50000  # Below this, a flat scan is cheap enough to keep
+
+    def _upgrade_flat_index(self, index: faiss.Index) -> faiss.Index:
+        """Rebuilds a legacy flat index as HNSW (same metric, same build
+           parameters as build_index.py) and persists it back so the rebuild
+           only ever happens once."""
+        logger.warning(f"Persisted FAISS index is flat with {index.ntotal} vectors; rebuilding as HNSW for sub-linear search...")
+        vectors = index.reconstruct_n(0, index.ntotal)
+        hnsw_index = faiss.IndexHNSWFlat(index.d, 32, index.metric_type)
+        hnsw_index.hnsw.efConstruction = 200
+        hnsw_index.add(vectors)
+        try:
+            faiss.write_index(hnsw_index, FAISS_INDEX_PATH)
+            logger.info(f"Upgraded HNSW index persisted to {FAISS_INDEX_PATH}.")
+        except Exception as e:
+            logger.warning(f"Could not persist upgraded index: {e}. Using the in-memory copy for this run.")
+        return hnsw_index
+
+    def _load_binary_index(self) -> "faiss.IndexBinary | None":
+        """Loads the optional binary (Hamming) index used as a cheap recall
+           stage before the float rerank. Missing file just disables it."""
+        binary_index_path = FAISS_INDEX_PATH.replace('.faiss', '_binary.faiss')
+        if not os.path.exists(binary_index_path):
+            logger.info("No binary index found; using float index search only.")
+            return None
+        try:
+            binary_index = faiss.read_index_binary(binary_index_path)
+            if binary_index.ntotal != self.index.ntotal:
+                logger.warning(f"Binary index size ({binary_index.ntotal}) does not match float index ({self.index.ntotal}). Ignoring it.")
+                return None
+            logger.info(f"Binary Hamming index loaded with {binary_index.ntotal} vectors.")
+            return binary_index
+        except Exception as e:
+            logger.warning(f"Could not load binary index from {binary_index_path}: {e}. Ignoring it.")
+            return None
+
+    BINARY_RECALL_K = 256  # Candidates pulled from the Hamming stage before rerank
+
+    def _search_chunks(self, query_embedding: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Searches the index for the top-k chunks, using the two-stage
+           binary-recall + float-rerank path when a binary index is loaded.
+           Returns (distances, indices) with lower-is-better distances."""
+        if self.binary_index is not None:
+            # Stage 1: Hamming search over sign-quantized vectors (popcount)
+            query_bits = np.packbits((query_embedding > 0).astype(np.uint8), axis=1)
+            recall_k = min(self.BINARY_RECALL_K, self.binary_index.ntotal)
+            _, candidate_ids = self.binary_index.search(query_bits, recall_k)
+            candidate_ids = candidate_ids[0][candidate_ids[0] >= 0]
+            if candidate_ids.size == 0:
+                return np.array([[]]), np.array([[]])
+            # Stage 2: exact rerank of the candidates with float dot products
+            candidate_vectors = np.vstack([self.index.reconstruct(int(c)) for c in candidate_ids])
+            similarities = candidate_vectors @ query_embedding[0]
+            order = np.argsort(-similarities)[:k]
+            distances = (1.0 - similarities[order])[np.newaxis, :]
+            indices = candidate_ids[order][np.newaxis, :]
+            return distances, indices
+
+        distances, indices = self.search_batcher.submit(query_embedding, k).result()
+        # Inner-product search returns cosine similarities (higher is
+        # better); convert to cosine distances so the lower-is-better
+        # ranking downstream works for either metric
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            distances = 1.0 - distances
+        return distances, indices
+
+    def _load_metadata(self) -> ChunkMetadata:
+        """Loads the chunk metadata as structure-of-arrays columns."""
         logger.info(f"Loading chunk metadata from {METADATA_PATH}...")
         if not os.path.exists(METADATA_PATH):
              logger.error(f"CRITICAL: Metadata file not found: {METADATA_PATH}")
              raise FileNotFoundError(f"Metadata file missing. Run build_index.py again: {METADATA_PATH}")
         try:
-            # Load from compressed pickle format
-            import pickle
-            with open(METADATA_PATH, 'rb') as f:
-                metadata_loaded = pickle.load(f)
-                # convert to int keys, fallback to string keys if error
-                try:
-                    metadata_processed = {int(k): v for k, v in metadata_loaded.items()}
-                    logger.info("Converted metadata keys to integers.")
-                    keys_are_int = True
-                except (ValueError, TypeError):
-                     logger.warning("Could not convert all metadata keys to integers. Using original keys (likely strings).")
-                     metadata_processed = metadata_loaded 
-                     keys_are_int = False
-
-            logger.info(f"Chunk metadata loaded for {len(metadata_processed)} chunks.")
-            # Perform consistency check only if keys are confirmed integers and index exists
-            if hasattr(self, 'index') and keys_are_int and self.index.ntotal != len(metadata_processed) and self.index.ntotal > 0:
-                 logger.warning(f"Potential Mismatch: FAISS index size ({self.index.ntotal}) vs integer-keyed metadata count ({len(metadata_processed)}).")
-            return metadata_processed
+            # Load from columnar Parquet format - row position equals FAISS
+            # id. The columns stay as flat arrays: Arrow's dictionary
+            # encoding yields the FAISS-row -> article-code mapping directly,
+            # with no per-chunk Python dict materialized at all
+            import pyarrow.parquet as pq
+            table = pq.read_table(METADATA_PATH, memory_map=True)
+            # combine_chunks() on a ChunkedArray returns a plain Array
+            encoded = table.column('article_id').dictionary_encode().combine_chunks()
+            metadata = ChunkMetadata(
+                article_code=encoded.indices.to_numpy().astype(np.int32, copy=False),
+                chunk_index=table.column('chunk_index').to_numpy().astype(np.int32, copy=False),
+                article_id_by_code=encoded.dictionary.to_pylist(),
+            )
+
+            logger.info(f"Chunk metadata loaded for {len(metadata)} chunks.")
+            # Consistency check against the FAISS index if it is already loaded
+            if hasattr(self, 'index') and self.index.ntotal != len(metadata) and self.index.ntotal > 0:
+                 logger.warning(f"Potential Mismatch: FAISS index size ({self.index.ntotal}) vs metadata row count ({len(metadata)}).")
+            return metadata
         except Exception as e:
              logger.error(f"CRITICAL: Error loading or processing chunk metadata from {METADATA_PATH}: {e}.", exc_info=True)
              raise RuntimeError(f"Could not load metadata: {e}")
 
+    @lru_cache(maxsize=1024)
+    def _embed_query(self, query: str) -> bytes:
+        """Encodes a query and returns the (already normalized) float32
+           embedding as bytes. LRU-cached on the exact query string so repeat
+           queries skip the transformer forward pass entirely; bytes keep the
+           cached value immutable and hashable. lru_cache's internal lock
+           makes this safe across request threads."""
+        query_embedding = self.embedding_batcher.submit(query).result()
+        # Index vectors are L2-normalized for the inner-product metric,
+        # so the query must be normalized the same way (before caching)
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            faiss.normalize_L2(query_embedding)
+        return query_embedding.tobytes()
+
     def get_article_details(self, article_id: str) -> dict | None:
-        """Retrieves article details (text, title, url) from the loaded lookup."""
-        return self.article_lookup.get(article_id)
+        """Retrieves article details (text, title, url, date) from the
+           memory-mapped lookup table."""
+        row = self.article_lookup.get(article_id)
+        if row is None:
+            return None
+        columns = self._lookup_columns
+        return {
+            'title': columns['title'][row].as_py(),
+            'url': columns['url'][row].as_py(),
+            'date': columns['date'][row].as_py(),
+            'text': columns['text'][row].as_py(),
+        }
 
     def retrieve_relevant_articles(self, query: str, k_chunks: int = NUM_FULL_ARTICLES_TO_USE * RETRIEVE_MULTIPLIER) -> tuple[list[dict], float]:
         """
@@ -178,7 +550,9 @@ class RAGSystem:
         retrieval_start_time = time.time()
         logger.info(f"Embedding query for retrieval: '{query[:100]}...'")
         try:
-             query_embedding = self.embedder.encode([query], convert_to_numpy=True).astype('float32')
+             # C-contiguous float32 view over the cached bytes - no fresh
+             # encode or array allocation on cache hits
+             query_embedding = np.frombuffer(self._embed_query(query), dtype='float32').reshape(1, -1)
         except Exception as e:
              logger.error(f"Failed to encode query: {e}", exc_info=True)
              retrieval_duration = time.time() - retrieval_start_time
@@ -197,67 +571,68 @@ class RAGSystem:
                  logger.warning("No chunks to search for (k=0 or index empty).")
                  distances, indices = np.array([[]]), np.array([[]]) 
             else:
-                 distances, indices = self.index.search(query_embedding, actual_k)
+                 distances, indices = self._search_chunks(query_embedding, actual_k)
 
-            logger.debug(f"FAISS search raw indices (k={actual_k}): {indices.tolist()}")
-            logger.debug(f"FAISS search raw distances (k={actual_k}): {distances.tolist()}")
+            # %-style args are only stringified when DEBUG is actually on -
+            # no eager .tolist() or f-string work on the hot path
+            logger.debug("FAISS search raw indices (k=%d): %s", actual_k, indices)
+            logger.debug("FAISS search raw distances (k=%d): %s", actual_k, distances)
         except Exception as e:
             logger.error(f"Error during FAISS search: {e}", exc_info=True)
             retrieval_duration = time.time() - retrieval_start_time
             return [], retrieval_duration
 
-        # Aggregate scores per article_id based on retrieved chunks
-        article_scores = {} # {article_id: [list of distances]}
-        if indices.size > 0 and indices[0].size > 0 and indices[0][0] != -1:
-            for i in range(indices.shape[1]): # Iterate through retrieved chunk indices
-                idx = indices[0, i]
-                dist = distances[0, i]
-                if idx < 0: continue # Skip potentially invalid index from FAISS
-
-                # Try int key first, then string key for robustness
-                chunk_meta = self.metadata.get(idx, self.metadata.get(str(idx)))
-                if chunk_meta and isinstance(chunk_meta, dict): # Ensure it's a dictionary
-                    article_id = chunk_meta.get('article_id')
-                    if article_id: # Ensure article_id exists
-                        if article_id not in article_scores:
-                            article_scores[article_id] = []
-                        article_scores[article_id].append(dist)
-                    else:
-                        logger.warning(f"Chunk metadata for index {idx} lacks 'article_id'.")
-                else:
-                    logger.warning(f"Metadata key '{idx}' not found or not a dictionary.")
-
-        if not article_scores:
+        # Aggregate scores per article with vectorized grouping: FAISS rows
+        # map to int article codes through the precomputed array, then one
+        # sort + reduceat replaces the per-chunk Python dict probes
+        ranked_articles = [] # [(article_id, min_distance, chunk_count)] best-first
+        if indices.size > 0 and indices[0].size > 0:
+            row_ids = np.asarray(indices[0])
+            valid = row_ids >= 0 # Skip potentially invalid index from FAISS
+            row_ids = row_ids[valid].astype(np.int64)
+            dists = np.asarray(distances[0])[valid]
+            if row_ids.size > 0:
+                codes = self.metadata.article_code[row_ids]
+                n_articles = len(self.metadata.article_id_by_code)
+                # Branchless scatter aggregation over the article space:
+                # minimum.at is unbuffered so repeated codes reduce
+                # correctly, and bincount gives per-article hit counts in
+                # one pass - no sort of the candidate list needed
+                min_dist_all = np.full(n_articles, np.inf, dtype=np.float32)
+                np.minimum.at(min_dist_all, codes, dists.astype(np.float32, copy=False))
+                counts_all = np.bincount(codes, minlength=n_articles)
+                hit_codes = np.flatnonzero(counts_all)
+                min_dists = min_dist_all[hit_codes]
+                counts = counts_all[hit_codes]
+                # Rank by minimum distance, ties broken by chunk frequency
+                rank = np.lexsort((-counts, min_dists))
+                ranked_articles = [
+                    (self.metadata.article_id_by_code[hit_codes[i]], float(min_dists[i]), int(counts[i]))
+                    for i in rank
+                ]
+
+        if not ranked_articles:
             logger.warning("No valid article IDs found from retrieved chunks.")
             retrieval_duration = time.time() - retrieval_start_time
             return [], retrieval_duration
 
-        # Rank articles by minimum distance, then by frequency (I used number of chunks)
-        ranked_articles = sorted(
-            article_scores.items(),
-            key=lambda item: (min(item[1]), -len(item[1]))
-        )
-        log_limit = min(len(ranked_articles), NUM_FULL_ARTICLES_TO_USE + 5)
-        logger.info(f"Ranked Articles (Top {log_limit}) (ID, [MinDist, Count]): {[(id, (float(min(scores)), len(scores))) for id, scores in ranked_articles[:log_limit]]}")
+        # Gate the summary comprehension so the tuples are only built when
+        # the INFO sink will actually emit them
+        if logger.isEnabledFor(logging.INFO):
+            log_limit = min(len(ranked_articles), NUM_FULL_ARTICLES_TO_USE + 5)
+            logger.info(f"Ranked Articles (Top {log_limit}) (ID, [MinDist, Count]): {[(aid, (min_dist, count)) for aid, min_dist, count in ranked_articles[:log_limit]]}")
 
         # Fetch full details for the top N ranked unique articles
         top_articles_data = []
         article_ids_fetched = set()
-        for article_id, scores in ranked_articles:
+        for article_id, min_distance, _count in ranked_articles:
             if len(top_articles_data) >= NUM_FULL_ARTICLES_TO_USE: break # Stop once we have enough
-            if article_id in article_ids_fetched: continue 
+            if article_id in article_ids_fetched: continue
 
             article_details = self.get_article_details(article_id)
             if article_details:
-                 # Find publication date from the first available chunk metadata for this article
-                 first_chunk_meta = None
-                 for chunk_idx_key in self.metadata:
-                     cm = self.metadata[chunk_idx_key]
-                     if isinstance(cm, dict) and cm.get('article_id') == article_id:
-                         first_chunk_meta = cm
-                         break
-                 pub_date = first_chunk_meta.get('publication_date') if first_chunk_meta else None
-
+                 # Publication date comes straight from the article lookup
+                 # ('date' below) - no scan over the chunk metadata needed
                  # Construct the article data dictionary
                  top_articles_data.append({
                     'id': article_id,
@@ -265,7 +640,7 @@ class RAGSystem:
                     'url': article_details.get('url'),
                     'date': article_details.get('date'),
                     'full_text': article_details.get('text'),
-                    'min_distance': float(min(scores)), 
+                    'min_distance': min_distance,
                  })
                  article_ids_fetched.add(article_id)
             else:
@@ -274,13 +649,36 @@ class RAGSystem:
         retrieval_duration = time.time() - retrieval_start_time
         logger.info(f"Retrieval phase duration: {retrieval_duration:.4f} seconds.")
         logger.info(f"Returning details for {len(top_articles_data)} articles.")
-        # Log summary of selected articles
-        for i, article_data in enumerate(top_articles_data):
-             log_dist = article_data.get('min_distance', -1.0)
-             logger.info(f"Selected Article {i+1}: ID={article_data.get('id', 'N/A')}, Min_Dist={log_dist:.4f}, Title={article_data.get('title', 'N/A')}")
+        # Log summary of selected articles (skip the loop entirely when the
+        # INFO level is off)
+        if logger.isEnabledFor(logging.INFO):
+            for i, article_data in enumerate(top_articles_data):
+                 log_dist = article_data.get('min_distance', -1.0)
+                 logger.info(f"Selected Article {i+1}: ID={article_data.get('id', 'N/A')}, Min_Dist={log_dist:.4f}, Title={article_data.get('title', 'N/A')}")
 
         return top_articles_data, retrieval_duration
 
+    def _extract_response_text(self, response_obj, description: str) -> str:
+        """Pulls the generated text out of a GenerateContentResponse, mapping
+           blocked/empty responses to the usual error strings."""
+        # For checking of response object structure
+        if not response_obj.candidates:
+             block_reason = getattr(getattr(response_obj, 'prompt_feedback', None), 'block_reason', None)
+             logger.warning(f"{description} LLM response had no candidates. Block reason: {block_reason}")
+             return f"Error: Content generation failed (no candidates){f', likely due to safety settings ({block_reason})' if block_reason else '.'}"
+        if hasattr(response_obj, 'prompt_feedback') and response_obj.prompt_feedback and response_obj.prompt_feedback.block_reason:
+             block_reason = response_obj.prompt_feedback.block_reason
+             logger.warning(f"{description} LLM blocked prompt. Reason: {block_reason}")
+             return f"Error: Content generation blocked by safety settings ({block_reason})..."
+        try:
+            # Access response text
+            response_text = response_obj.text
+            logger.info(f"{description} LLM response extracted successfully.")
+            return response_text
+        except (IndexError, AttributeError, TypeError) as e:
+             logger.error(f"Could not extract text from {description} LLM response structure: {e}", exc_info=True)
+             return f"Error: Could not parse {description} LLM's response structure."
+
     def _call_llm(self, llm_config, prompt: str, description: str) -> tuple[str, float]:
         """Helper function to call an LLM, handle errors, and time the call."""
         logger.info(f"Sending prompt to {description} LLM ({llm_config['model_name'] if llm_config else 'N/A'})...")
@@ -290,93 +688,87 @@ class RAGSystem:
             logger.error(f"{description} LLM is not available.")
             return f"Error: {description} LLM not initialized.", 0.0
 
-        start_time = time.time()
+        # Monotonic integer clock: immune to wall-clock adjustments and the
+        # nanosecond variant avoids a float allocation until the division below
+        start_ns = time.perf_counter_ns()
         try:
-            # Configure thinking budget for 2.5 models
-            config = None
-            if "2.5" in llm_config['model_name']:
-                config = types.GenerateContentConfig(
-                    thinking_config=types.ThinkingConfig(thinking_budget=0)  # Disable thinking
-                )
-            
             response_obj = llm_config['client'].models.generate_content(
                 model=llm_config['model_name'],
                 contents=prompt,
-                config=config
+                config=llm_config['config']
             )
-
-            # For checking of response object structure
-            if not response_obj.candidates:
-                 block_reason = getattr(getattr(response_obj, 'prompt_feedback', None), 'block_reason', None)
-                 logger.warning(f"{description} LLM response had no candidates. Block reason: {block_reason}")
-                 response_text = f"Error: Content generation failed (no candidates){f', likely due to safety settings ({block_reason})' if block_reason else '.'}"
-            elif hasattr(response_obj, 'prompt_feedback') and response_obj.prompt_feedback and response_obj.prompt_feedback.block_reason:
-                 block_reason = response_obj.prompt_feedback.block_reason
-                 logger.warning(f"{description} LLM blocked prompt. Reason: {block_reason}")
-                 response_text = f"Error: Content generation blocked by safety settings ({block_reason})..."
-            else:
-                try:
-                    # Access response text
-                    response_text = response_obj.text
-                    logger.info(f"{description} LLM response extracted successfully.")
-                except (IndexError, AttributeError, TypeError) as e:
-                     logger.error(f"Could not extract text from {description} LLM response structure: {e}", exc_info=True)
-                     response_text = f"Error: Could not parse {description} LLM's response structure."
+            response_text = self._extract_response_text(response_obj, description)
         except Exception as e:
             logger.error(f"Exception during {description} LLM call: {e}", exc_info=True)
-            response_text = f"Error generating {description} response: {type(e).__name__}" 
+            response_text = f"Error generating {description} response: {type(e).__name__}"
         finally:
-            end_time = time.time()
-            llm_call_duration = end_time - start_time
-            logger.info(f"LLM generate_content call duration ({description}): {llm_call_duration:.4f} seconds")
+            llm_call_duration = (time.perf_counter_ns() - start_ns) / 1e9
             logger.info(f"LLM generate_content call duration ({description}): {llm_call_duration:.4f} seconds")
 
         return response_text, llm_call_duration
 
+    async def _call_llm_async(self, llm_config, prompt: str, description: str) -> tuple[str, float]:
+        """Async twin of _call_llm using the client's aio surface, so several
+           generation calls can be awaited concurrently on one event loop."""
+        logger.info(f"Sending prompt to {description} LLM ({llm_config['model_name'] if llm_config else 'N/A'})...")
+        response_text = f"Error: Failed to generate {description} response."
+        if llm_config is None:
+            logger.error(f"{description} LLM is not available.")
+            return f"Error: {description} LLM not initialized.", 0.0
 
-    def generate_rag_response(self, query: str) -> tuple[str, list[dict], float, float, int]:
-        """Generates RAG response using Generator LLM and returns response text, context info, retrieval duration, LLM duration, context length."""
-        logger.info(f"--- Generating RAG Response (Full Text) using {GEMINI_MODEL_NAME} for Query: '{query[:100]}...' ---")
-
-        # Step 1: Retrieve relevant articles and retrieval duration
-        retrieved_articles, retrieval_duration = self.retrieve_relevant_articles(query)
+        start_ns = time.perf_counter_ns()
+        try:
+            response_obj = await llm_config['client'].aio.models.generate_content(
+                model=llm_config['model_name'],
+                contents=prompt,
+                config=llm_config['config']
+            )
+            response_text = self._extract_response_text(response_obj, description)
+        except Exception as e:
+            logger.error(f"Exception during {description} LLM call: {e}", exc_info=True)
+            response_text = f"Error generating {description} response: {type(e).__name__}"
+        finally:
+            llm_call_duration = (time.perf_counter_ns() - start_ns) / 1e9
+            logger.info(f"LLM generate_content call duration ({description}): {llm_call_duration:.4f} seconds")
 
-        # Step 2: Prepare simplified context for returning (to frontend/evaluator script)
-        simplified_context_for_frontend = [
-             { "text": article.get("full_text", "")[:500] + "...", # Truncate for summary
-               "source": article.get("url", "Source URL Missing"),
-               "title": article.get("title", "Source Title Missing"),
-               "date": article.get("date", "N/A"),
-               "article_id": article.get("id"),
-               "min_distance": article.get("min_distance")
-             } for article in retrieved_articles
-        ]
+        return response_text, llm_call_duration
 
-        # Handle case where no articles are retrieved
-        if not retrieved_articles:
-            logger.warning("No relevant articles found for RAG, falling back to standard response generation.")
-            # Call standard generation but only return its text, keeping RAG durations accurate
-            std_response_text, _ = self.generate_standard_response(query)
-            return f"(No relevant 2015 articles found to augment response.)\n\n{std_response_text}", [], retrieval_duration, 0.0, 0
 
-        # Step 3: Construct the prompt context from full article texts
-        context_items = []
+    def _build_contexts(self, retrieved_articles: list[dict]) -> tuple[str, list[dict], int]:
+        """Single pass over the retrieved articles producing the prompt
+           context block, the truncated summaries for the frontend/evaluator,
+           and the total context length in characters."""
+        # Stream the context into one StringIO buffer instead of building a
+        # full_item string per article and joining: the ~350KB of article
+        # text per request gets copied once, not twice
+        buf = io.StringIO()
+        simplified_context = []
         total_context_chars = 0
         for i, article in enumerate(retrieved_articles):
+             article_text = article.get('full_text', '')
+             simplified_context.append({
+                 "text": f"{article_text[:500]}...", # Truncate for summary
+                 "source": article.get("url", "Source URL Missing"),
+                 "title": article.get("title", "Source Title Missing"),
+                 "date": article.get("date", "N/A"),
+                 "article_id": article.get("id"),
+                 "min_distance": article.get("min_distance")
+             })
              article_url = article.get('url', 'URL_NOT_FOUND')
              article_date = article.get('date', 'DATE_NOT_FOUND')
-             source_info = f"[ARTICLE {i+1} START | URL: {article_url} | DATE: {article_date}]"
-             end_info = f"[ARTICLE {i+1} END]"
-             article_text = article.get('full_text', '')
-             if len(article_text) > MAX_ARTICLE_TEXT_LEN:
-                 logger.warning(f"Truncating article {article.get('id')} from {len(article_text)} to {MAX_ARTICLE_TEXT_LEN} chars for LLM context.")
-                 article_text = article_text[:MAX_ARTICLE_TEXT_LEN] + "..."
-             full_item = f"{source_info}\n{article_text}\n{end_info}"
-             context_items.append(full_item)
-             total_context_chars += len(full_item)
-        context_str = "\n\n---\n\n".join(context_items)
-
-        # Step 4: Define the RAG prompt for the Generator LLM
+             if i:
+                 buf.write("\n\n---\n\n")
+             item_start = buf.tell()
+             buf.write(f"[ARTICLE {i+1} START | URL: {article_url} | DATE: {article_date}]\n")
+             # Article text is already capped to MAX_ARTICLE_TEXT_LEN at
+             # build time - no per-request truncation copy needed
+             buf.write(article_text)
+             buf.write(f"\n[ARTICLE {i+1} END]")
+             total_context_chars += buf.tell() - item_start
+        return buf.getvalue(), simplified_context, total_context_chars
+
+    def _build_rag_prompt(self, query: str, context_str: str) -> str:
+        """Wraps an assembled context block in the RAG generation prompt."""
         prompt = f"""You are an AI assistant answering questions, leveraging the full text of relevant news articles published in 2015 provided in the context below.
 
 Instructions:
@@ -396,6 +788,33 @@ Context:
 Question: {query}
 
 Answer:"""
+        return prompt
+
+    def generate_rag_response(self, query: str) -> tuple[str, list[dict], float, float, int]:
+        """Generates RAG response using Generator LLM and returns response text, context info, retrieval duration, LLM duration, context length."""
+        # Step 1: Retrieve relevant articles and retrieval duration
+        retrieved_articles, retrieval_duration = self.retrieve_relevant_articles(query)
+        return self.generate_rag_response_from_context(query, retrieved_articles, retrieval_duration)
+
+    def generate_rag_response_from_context(self, query: str, retrieved_articles: list[dict],
+                                           retrieval_duration: float) -> tuple[str, list[dict], float, float, int]:
+        """Generation half of generate_rag_response, taking already-retrieved
+           articles. Split out so callers can pipeline retrieval (CPU-bound)
+           against in-flight LLM calls (network-bound) and schedule the two
+           halves independently."""
+        logger.info(f"--- Generating RAG Response (Full Text) using {GEMINI_MODEL_NAME} for Query: '{query[:100]}...' ---")
+
+        # Handle case where no articles are retrieved
+        if not retrieved_articles:
+            logger.warning("No relevant articles found for RAG, falling back to standard response generation.")
+            # Call standard generation but only return its text, keeping RAG durations accurate
+            std_response_text, _ = self.generate_standard_response(query)
+            return f"(No relevant 2015 articles found to augment response.)\n\n{std_response_text}", [], retrieval_duration, 0.0, 0
+
+        # Steps 2-4: Assemble the prompt context and frontend summaries in one
+        # pass, then wrap in the RAG prompt
+        context_str, simplified_context_for_frontend, total_context_chars = self._build_contexts(retrieved_articles)
+        prompt = self._build_rag_prompt(query, context_str)
 
         # Step 5: Call the Generator LLM using the helper function
         response_text, llm_call_duration = self._call_llm(self.generator_llm, prompt, "RAG Generator")
@@ -403,6 +822,39 @@ Answer:"""
         # Step 6: Return all collected data
         return response_text, simplified_context_for_frontend, retrieval_duration, llm_call_duration, total_context_chars
 
+    def stream_rag_response(self, query: str):
+        """Streams the RAG answer as text chunks while the Generator LLM is
+           still producing it, so callers render from time-to-first-token
+           instead of waiting out the full generation. Falls back to
+           streaming a standard answer when retrieval finds nothing."""
+        logger.info(f"--- Streaming RAG Response using {GEMINI_MODEL_NAME} for Query: '{query[:100]}...' ---")
+        retrieved_articles, _ = self.retrieve_relevant_articles(query)
+        if retrieved_articles:
+            context_str, _, _ = self._build_contexts(retrieved_articles)
+            prompt = self._build_rag_prompt(query, context_str)
+        else:
+            logger.warning("No relevant articles found for RAG, streaming standard response instead.")
+            yield "(No relevant 2015 articles found to augment response.)\n\n"
+            prompt = query
+
+        llm_config = self.generator_llm
+        if llm_config is None:
+            logger.error("Generator LLM is not available.")
+            yield "Error: Generator LLM not initialized."
+            return
+        try:
+            stream = llm_config['client'].models.generate_content_stream(
+                model=llm_config['model_name'],
+                contents=prompt,
+                config=llm_config['config']
+            )
+            for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Exception during streaming RAG Generator LLM call: {e}", exc_info=True)
+            yield f"Error generating RAG response: {type(e).__name__}"
+
     def generate_standard_response(self, query: str) -> tuple[str, float]:
         """Generates standard response using Generator LLM and returns response text and LLM duration."""
         logger.info(f"--- Generating Standard LLM Response ({GEMINI_MODEL_NAME}) for Query: '{query[:100]}...' ---")
@@ -410,104 +862,187 @@ Answer:"""
         response_text, llm_call_duration = self._call_llm(self.generator_llm, query, "Standard Generator")
         return response_text, llm_call_duration
 
-    def generate_combined_responses(self, query: str) -> tuple[str, str, list[dict], float, float, int]:
-        """Generates both standard and RAG responses in a single LLM call for better performance."""
-        logger.info(f"--- Generating Combined Responses using {GEMINI_MODEL_NAME} for Query: '{query[:100]}...' ---")
-        
+    def generate(self, query: str, modes: "set[str] | frozenset[str]" = frozenset(('standard', 'rag'))) -> dict:
+        """Unified generation entry point. Callers pass only the response
+           paths they will actually consume - output tokens are the dominant
+           latency driver, so a single-mode request skips the other answer
+           entirely instead of generating and discarding it. Returns a dict
+           with the keys for the requested modes."""
+        modes = frozenset(modes)
+        unknown = modes - {'standard', 'rag'}
+        if unknown:
+            raise ValueError(f"Unknown generation modes: {sorted(unknown)}")
+
+        if modes == {'standard'}:
+            response_text, llm_duration = self.generate_standard_response(query)
+            return {'standard_response': response_text, 'llm_duration': llm_duration}
+
+        if modes == {'rag'}:
+            rag_text, context_info, retrieval_duration, llm_duration, context_length = self.generate_rag_response(query)
+            return {'rag_response': rag_text, 'retrieved_context': context_info,
+                    'retrieval_duration': retrieval_duration, 'llm_duration': llm_duration,
+                    'context_length': context_length}
+
+        # Both modes: the two calls overlap on the event loop
+        std_text, rag_text, context_info, retrieval_duration, llm_duration, context_length = self.generate_combined_responses(query)
+        return {'standard_response': std_text, 'rag_response': rag_text,
+                'retrieved_context': context_info, 'retrieval_duration': retrieval_duration,
+                'llm_duration': llm_duration, 'context_length': context_length}
+
+    async def _generate_combined_responses_async(self, query: str) -> tuple[str, str, list[dict], float, float, int]:
+        """Runs the standard and RAG generation calls concurrently on the
+           event loop so their network latencies overlap."""
         # Step 1: Retrieve relevant articles and retrieval duration
         retrieved_articles, retrieval_duration = self.retrieve_relevant_articles(query)
-        
-        # Step 2: Prepare simplified context for returning (to frontend/evaluator script)
-        simplified_context_for_frontend = [
-             { "text": article.get("full_text", "")[:500] + "...", # Truncate for summary
-               "source": article.get("url", "Source URL Missing"),
-               "title": article.get("title", "Source Title Missing"),
-               "date": article.get("date", "N/A"),
-               "article_id": article.get("id"),
-               "min_distance": article.get("min_distance")
-             } for article in retrieved_articles
-        ]
-        
+
         # Handle case where no articles are retrieved
         if not retrieved_articles:
             logger.warning("No relevant articles found for RAG, falling back to standard response generation.")
-            std_response_text, llm_duration = self.generate_standard_response(query)
+            std_response_text, llm_duration = await self._call_llm_async(self.generator_llm, query, "Standard Generator")
             return std_response_text, f"(No relevant 2015 articles found to augment response.)\n\n{std_response_text}", [], retrieval_duration, llm_duration, 0
-        
-        # Step 3: Construct the prompt context from full article texts
-        context_items = []
-        total_context_chars = 0
-        for i, article in enumerate(retrieved_articles):
-             article_url = article.get('url', 'URL_NOT_FOUND')
-             article_date = article.get('date', 'DATE_NOT_FOUND')
-             source_info = f"[ARTICLE {i+1} START | URL: {article_url} | DATE: {article_date}]"
-             end_info = f"[ARTICLE {i+1} END]"
-             article_text = article.get('full_text', '')
-             if len(article_text) > MAX_ARTICLE_TEXT_LEN:
-                 logger.warning(f"Truncating article {article.get('id')} from {len(article_text)} to {MAX_ARTICLE_TEXT_LEN} chars for LLM context.")
-                 article_text = article_text[:MAX_ARTICLE_TEXT_LEN] + "..."
-             full_item = f"{source_info}\n{article_text}\n{end_info}"
-             context_items.append(full_item)
-             total_context_chars += len(full_item)
-        context_str = "\n\n---\n\n".join(context_items)
-        
-        # Step 4: Define the combined prompt for both responses
-        prompt = f"""Generate TWO comprehensive responses to the following question:
-
-RESPONSE 1 - STANDARD: 
-- Provide a detailed, comprehensive answer using only your general knowledge
-- Include specific examples, dates, and key details where relevant
-- Structure your response with clear explanations and context
-- Aim for thorough coverage of the topic
-
-RESPONSE 2 - RAG: 
-- Analyze the provided 2015 Guardian articles context below
-- Cite sources using numbered references [1], [2], [3] corresponding to article numbers
-- Synthesize information across articles when relevant  
-- Extract specific details, names, dates, and arguments from the articles
-- Provide comprehensive coverage using the article context
 
-Context:
----
-{context_str}
----
+        # Steps 2-4: Assemble the prompt context and frontend summaries in one
+        # pass, then wrap in the RAG prompt
+        context_str, simplified_context_for_frontend, total_context_chars = self._build_contexts(retrieved_articles)
+        rag_prompt = self._build_rag_prompt(query, context_str)
 
-Question: {query}
+        # Step 5: Dispatch both generation calls and await them together
+        (standard_response, standard_duration), (rag_response, rag_duration) = await asyncio.gather(
+            self._call_llm_async(self.generator_llm, query, "Standard Generator"),
+            self._call_llm_async(self.generator_llm, rag_prompt, "RAG Generator"),
+        )
+        # Wall-clock LLM time is the slower of the two overlapped calls
+        llm_call_duration = max(standard_duration, rag_duration)
 
-Format your response as:
-STANDARD_RESPONSE:
-[comprehensive standard answer here]
+        return standard_response, rag_response, simplified_context_for_frontend, retrieval_duration, llm_call_duration, total_context_chars
 
-RAG_RESPONSE:
-[comprehensive context-based answer here with citations]"""
+    def generate_combined_responses(self, query: str) -> tuple[str, str, list[dict], float, float, int]:
+        """Generates the standard and RAG responses as two concurrent LLM calls.
 
-        # Step 5: Call the Generator LLM using the helper function
-        combined_response, llm_call_duration = self._call_llm(self.generator_llm, prompt, "Combined Generator")
-        
-        # Step 6: Parse the combined response into standard and RAG parts
-        standard_response = ""
-        rag_response = ""
-        
-        try:
-            if "STANDARD_RESPONSE:" in combined_response and "RAG_RESPONSE:" in combined_response:
-                parts = combined_response.split("RAG_RESPONSE:")
-                standard_part = parts[0].replace("STANDARD_RESPONSE:", "").strip()
-                rag_part = parts[1].strip()
-                standard_response = standard_part
-                rag_response = rag_part
-            else:
-                # Fallback if parsing fails
-                logger.warning("Failed to parse combined response, using fallback")
-                standard_response = "Error parsing standard response from combined output."
-                rag_response = combined_response
-        except Exception as e:
-            logger.error(f"Error parsing combined response: {e}")
-            standard_response = "Error parsing standard response."
-            rag_response = combined_response
-        
-        return standard_response, rag_response, simplified_context_for_frontend, retrieval_duration, llm_call_duration, total_context_chars
+        Replaces the old single combined prompt: the two answers no longer
+        share one serial output stream (they generate in parallel) and the
+        brittle STANDARD_RESPONSE:/RAG_RESPONSE: split parsing goes away
+        because each call returns its own text.
+        """
+        logger.info(f"--- Generating Combined Responses using {GEMINI_MODEL_NAME} for Query: '{query[:100]}...' ---")
+        return asyncio.run(self._generate_combined_responses_async(query))
+
+    def evaluate_responses_batch(self, triples: list[tuple[str, str, str, str]]) -> "tuple[list[EvaluationResult | None], float]":
+        """Evaluates several (query_id, query, standard_response, rag_response)
+           triples in a single Evaluator LLM round-trip. Returns a list of
+           verdict dicts aligned with the input order plus the call duration.
+           Falls back to per-item evaluate_responses_with_llm calls when the
+           batch output cannot be parsed."""
+        if self.evaluator_llm is None:
+            logger.error("Evaluator LLM not available. Skipping batch LLM evaluation.")
+            return [None] * len(triples), 0.0
+
+        max_eval_input_len = 6000 # Tighter per-item cap than single eval to bound the batch prompt
+        items = []
+        for i, (query_id, query, standard_response, rag_response) in enumerate(triples):
+            standard_str = str(standard_response) if standard_response is not None else "(Standard response was None or generation failed)"
+            rag_str = str(rag_response) if rag_response is not None else "(RAG response was None or generation failed)"
+            if len(standard_str) > max_eval_input_len:
+                standard_str = standard_str[:max_eval_input_len] + "... (truncated for evaluation)"
+            if len(rag_str) > max_eval_input_len:
+                rag_str = rag_str[:max_eval_input_len] + "... (truncated for evaluation)"
+            items.append(
+                f"### ITEM {i+1} (query_id: {query_id})\n"
+                f"**Query:**\n```text\n{query}\n```\n"
+                f"**Standard LLM Response:**\n```text\n{standard_str}\n```\n"
+                f"**RAG LLM Response:**\n```text\n{rag_str}\n```"
+            )
+
+        logger.info("--- Batch-evaluating %d query triples using %s ---", len(triples), EVALUATOR_LLM_MODEL_NAME)
 
-    def evaluate_responses_with_llm(self, query: str, standard_response: str, rag_response: str) -> tuple[dict | None, float]:
+        batch_prompt = f"""You are an expert evaluator assessing the quality of AI-generated answers (Standard vs. RAG) to queries about events/topics from the year 2015. The RAG responses had access to 2015 news articles.
+
+**Task:** For EACH of the {len(triples)} items below, evaluate both responses on the criteria (1=Very Poor, 5=Excellent), focusing *only* on the 2015 context. Output **only** a valid JSON array with one object per item, in item order. Scores must be integers between 1 and 5.
+
+**Criteria:** relevance, factual_accuracy_2015, specificity_2015, groundedness_to_source (RAG only; "N/A" string for Standard), temporal_accuracy, completeness, coherence, lack_of_hallucination_2015.
+
+{chr(10).join(items)}
+
+**Instructions to Evaluator:**
+Return a JSON array in the *exact* format below (no extra keys, no comments), one element per item in the same order:
+
+```json
+[
+  {{
+    "query_id": "<query_id>",
+    "standard_scores": {{
+      "relevance": <score_int>,
+      "factual_accuracy_2015": <score_int>,
+      "specificity_2015": <score_int>,
+      "temporal_accuracy": <score_int>,
+      "completeness": <score_int>,
+      "coherence": <score_int>,
+      "lack_of_hallucination_2015": <score_int>
+    }},
+    "rag_scores": {{
+      "relevance": <score_int>,
+      "factual_accuracy_2015": <score_int>,
+      "specificity_2015": <score_int>,
+      "groundedness_to_source": <score_int_or_NA_string>,
+      "temporal_accuracy": <score_int>,
+      "completeness": <score_int>,
+      "coherence": <score_int>,
+      "lack_of_hallucination_2015": <score_int>
+    }},
+    "comparative_summary": "<1-2 sentence comparison focusing on 2015 context>"
+  }}
+]
+```"""
+
+        raw_text, batch_duration = self._call_llm(self.evaluator_llm, batch_prompt, "Batch LLM Evaluator")
+
+        if "Error:" not in raw_text:
+            try:
+                # JSON mode usually yields bare JSON; parse directly and only
+                # fall back to the span scan if the model fenced it anyway
+                try:
+                    parsed = orjson.loads(raw_text)
+                except orjson.JSONDecodeError:
+                    json_str = _extract_json_span(raw_text, '[', ']')
+                    if json_str is None:
+                        raise ValueError("Could not find JSON array in batch evaluator response.")
+                    parsed = orjson.loads(json_str)
+                if not isinstance(parsed, list) or len(parsed) != len(triples):
+                    raise ValueError(f"Batch verdict count mismatch: got {len(parsed) if isinstance(parsed, list) else 'non-list'}, expected {len(triples)}.")
+
+                # Map verdicts by query_id where possible, falling back to position
+                by_id = {v.get('query_id'): v for v in parsed if isinstance(v, dict)}
+                verdicts = []
+                for i, (query_id, *_rest) in enumerate(triples):
+                    verdict = by_id.get(query_id, parsed[i] if isinstance(parsed[i], dict) else None)
+                    if verdict and "standard_scores" in verdict and "rag_scores" in verdict and "comparative_summary" in verdict:
+                        grounded_score = verdict.get("rag_scores", {}).get("groundedness_to_source")
+                        if grounded_score not in _VALID_GROUNDED:
+                            verdict["rag_scores"]["groundedness_to_source"] = "N/A"
+                        verdicts.append(EvaluationResult(
+                            standard_scores=verdict["standard_scores"],
+                            rag_scores=verdict["rag_scores"],
+                            comparative_summary=verdict["comparative_summary"],
+                        ))
+                    else:
+                        raise ValueError(f"Batch verdict for '{query_id}' missing required keys.")
+                logger.info("Successfully parsed %d batch evaluation verdicts.", len(verdicts))
+                return verdicts, batch_duration
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error("Could not parse batch evaluator response (%s); falling back to per-item calls.", e)
+        else:
+            logger.error("Batch evaluator call failed (%s); falling back to per-item calls.", raw_text[:100])
+
+        # Fallback: evaluate each triple individually
+        verdicts = []
+        total_duration = batch_duration
+        for query_id, query, standard_response, rag_response in triples:
+            verdict, duration = self.evaluate_responses_with_llm(query, standard_response, rag_response)
+            verdicts.append(verdict)
+            total_duration += duration
+        return verdicts, total_duration
+
+    def evaluate_responses_with_llm(self, query: str, standard_response: str, rag_response: str) -> "tuple[EvaluationResult | None, float]":
         """Uses Evaluator LLM (Gemini Pro 1.5) to evaluate and compare responses."""
         if self.evaluator_llm is None:
             logger.error("Evaluator LLM not available. Skipping LLM evaluation.")
@@ -523,68 +1058,18 @@ RAG_RESPONSE:
         if len(rag_response_str) > max_eval_input_len:
              rag_response_str = rag_response_str[:max_eval_input_len] + "... (truncated for evaluation)"
 
-        logger.info(f"--- Evaluating responses using {EVALUATOR_LLM_MODEL_NAME} for query: '{query[:100]}...' ---")
-
-        # The detailed prompt for the evaluator
-        evaluation_prompt = f"""You are an expert evaluator assessing the quality of two AI-generated answers (Standard vs. RAG) to a query about events/topics from the year 2015. The RAG response had access to 2015 news articles.
-
-**Task:** Evaluate both responses on the criteria below (1=Very Poor, 5=Excellent), focusing *only* on the 2015 context. Output **only** a valid JSON object adhering strictly to the specified format. Scores must be integers between 1 and 5.
-
-**Criteria:**
-1.  **Relevance (1-5):** How directly does the response address the specific query?
-2.  **Factual Accuracy (2015 Context) (1-5):** Accuracy of info *about 2015*? (Ignore other periods).
-3.  **Specificity/Detail (2015 Context) (1-5):** Richness in specific 2015 details (names, dates, figures, etc.)?
-4.  **Groundedness (RAG Only) (1-5):** Does the RAG response seem based on plausible 2015 sources? Score 1 (generic) to 5 (source-based). Assign "N/A" (as a string) for Standard.
-5.  **Temporal Accuracy (1-5):** Does the response correctly stay within/reference the 2015 timeframe?
-6.  **Completeness (1-5):** How thoroughly does the response address all aspects of the query?
-7.  **Coherence/Readability (1-5):** How well-structured and clear is the response?
-8.  **Lack of Hallucination (2015 Context) (1-5):** How free from plausible but false info *about 2015*?
-
-**Query:**
-```text
-{query}
-```
-
-**Standard LLM Response:**
-```text
-{standard_response_str}
-```
-
-**RAG LLM Response:**
-```text
-{rag_response_str}
-```
-**Instructions to Evaluator:**  
-Return your ratings in the *exact* JSON format below (no extra keys, no comments):
+        logger.info("--- Evaluating responses using %s for query: '%s...' ---", EVALUATOR_LLM_MODEL_NAME, query[:100])
 
-```json
-{{
-  "standard_scores": {{
-    "relevance": <score_int>,
-    "factual_accuracy_2015": <score_int>,
-    "specificity_2015": <score_int>,
-    "temporal_accuracy": <score_int>,
-    "completeness": <score_int>,
-    "coherence": <score_int>,
-    "lack_of_hallucination_2015": <score_int>
-  }},
-  "rag_scores": {{
-    "relevance": <score_int>,
-    "factual_accuracy_2015": <score_int>,
-    "specificity_2015": <score_int>,
-    "groundedness_to_source": <score_int_or_NA_string>,
-    "temporal_accuracy": <score_int>,
-    "completeness": <score_int>,
-    "coherence": <score_int>,
-    "lack_of_hallucination_2015": <score_int>
-  }},
-  "comparative_summary": "<1–2 sentence comparison focusing on 2015 context>"
-}}
-```"""
-        # ---------- code resumes immediately after closing the prompt string ----------
+        # Assemble the detailed evaluator prompt from the constant fragments
+        evaluation_prompt = "".join((
+            _EVAL_PROMPT_HEAD, query,
+            _EVAL_PROMPT_MID_STANDARD, standard_response_str,
+            _EVAL_PROMPT_MID_RAG, rag_response_str,
+            _EVAL_PROMPT_TAIL,
+        ))
         evaluation_result = None
         llm_eval_duration = 0.0
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
             # Use the helper for the call
             raw_text, llm_eval_duration = self._call_llm(
@@ -595,32 +1080,23 @@ Return your ratings in the *exact* JSON format below (no extra keys, no comments
 
             # Attempt to parse the JSON from the raw_text
             if "Error:" not in raw_text: 
-                logger.debug(f"Raw Evaluator LLM Output:\n{raw_text}")
-                json_str = None
+                logger.debug("Raw Evaluator LLM Output:\n%s", raw_text)
                 try:
-                    # Try finding markdown block first
-                    json_match = re.search(
-                        r'```(?:json)?\s*(\{.*?\})\s*```',
-                        raw_text,
-                        re.DOTALL | re.IGNORECASE
-                    )
-                    if json_match:
-                        json_str = json_match.group(1)
-                        logger.info("Extracted JSON from markdown block.")
-                    else:
-                        # Fallback hack: find first '{' and last '}'
-                        first_brace = raw_text.find('{')
-                        last_brace = raw_text.rfind('}')
-                        if first_brace != -1 and last_brace != -1:
-                            json_str = raw_text[first_brace:last_brace + 1]
-                            logger.info("Extracted JSON using first/last brace.")
-                        else:
+                    # JSON mode usually yields bare JSON; parse directly and
+                    # only fall back to the balanced-brace scan if the model
+                    # fenced it or appended prose anyway
+                    try:
+                        temp_result = orjson.loads(raw_text)
+                    except orjson.JSONDecodeError:
+                        json_str = _extract_json_span(raw_text)
+                        if json_str is None:
                             raise ValueError(
                                 "Could not find JSON structure in evaluator response."
                             )
+                        temp_result = orjson.loads(json_str)
+                    logger.info("Extracted JSON from evaluator response.")
 
                     # Validation of basic structure before assigning
-                    temp_result = json.loads(json_str)
                     if (
                         "standard_scores" in temp_result and
                         "rag_scores" in temp_result and
@@ -630,84 +1106,93 @@ Return your ratings in the *exact* JSON format below (no extra keys, no comments
                         grounded_score = temp_result.get(
                             "rag_scores", {}
                         ).get("groundedness_to_source")
-                        if not (
-                            isinstance(grounded_score, int) and
-                            1 <= grounded_score <= 5
-                        ) and grounded_score != "N/A":
+                        if grounded_score not in _VALID_GROUNDED:
                             logger.warning(
-                                f"Adjusting invalid groundedness score "
-                                f"'{grounded_score}' to N/A."
+                                "Adjusting invalid groundedness score '%s' to N/A.",
+                                grounded_score
                             )
                             temp_result["rag_scores"]["groundedness_to_source"] = "N/A"
 
-                        evaluation_result = temp_result
+                        evaluation_result = EvaluationResult(
+                            standard_scores=temp_result["standard_scores"],
+                            rag_scores=temp_result["rag_scores"],
+                            comparative_summary=temp_result["comparative_summary"],
+                        )
                         logger.info("Successfully parsed LLM evaluation result.")
                     else:
                         logger.error(
-                            f"Parsed JSON missing required keys: {temp_result.keys()}"
+                            "Parsed JSON missing required keys: %s", temp_result.keys()
                         )
                         raise ValueError("Parsed JSON has incorrect structure")
 
-                except (json.JSONDecodeError, ValueError) as e:
+                except ValueError as e:
                     logger.error(
-                        f"Could not extract or parse JSON from Evaluator response: {e}",
-                        exc_info=True
+                        "Could not extract or parse JSON from Evaluator response: %s",
+                        e, exc_info=True
                     )
                     logger.error(
-                        f"Problematic Raw Text (first 500 chars): "
-                        f"{raw_text[:500]}..."
+                        "Problematic Raw Text (first 500 chars): %s...",
+                        raw_text[:500]
                     )
-                    evaluation_result = {
-                        "error": f"JSON parsing failed: {e}"
-                    }  # Store parsing error
+                    evaluation_result = EvaluationResult(
+                        error=f"JSON parsing failed: {e}"
+                    )  # Store parsing error
             else:
                 # Generation itself failed, store the error string
-                evaluation_result = {"error": raw_text}
+                evaluation_result = EvaluationResult(error=raw_text)
 
         except Exception as e:
             # Catch errors from _call_llm or other issues
             logger.error(
-                f"Unexpected exception during LLM Evaluation processing: {e}",
-                exc_info=True
+                "Unexpected exception during LLM Evaluation processing: %s",
+                e, exc_info=True
             )
-            evaluation_result = {"error": f"Evaluation processing error: {e}"}
-            llm_eval_duration = time.time() - start_time  
+            evaluation_result = EvaluationResult(error=f"Evaluation processing error: {e}")
+            llm_eval_duration = (time.perf_counter_ns() - start_ns) / 1e9
 
         logger.info(
-            f"LLM Evaluation call and processing duration: "
-            f"{llm_eval_duration:.4f} seconds"
+            "LLM Evaluation call and processing duration: %.4f seconds",
+            llm_eval_duration
         )
         return evaluation_result, llm_eval_duration 
     
-_rag_system_instance: "RAGSystem | None" = None
-
+@lru_cache(maxsize=1)
 def get_rag_system() -> "RAGSystem":
-    """Initialise and return a singleton instance of the RAGSystem."""
-    global _rag_system_instance
-
-    if _rag_system_instance is None:
-        # To verify that all essential index files exist
-        essential_files = {
-            "FAISS Index": FAISS_INDEX_PATH,
-            "Chunk Metadata": METADATA_PATH,
-            "Article Lookup": ARTICLE_LOOKUP_PATH,
-        }
+    """Initialise and return a singleton instance of the RAGSystem. lru_cache
+       replaces the manual module-global check - the cached-instance dispatch
+       runs in C and the existence checks below only ever run once - matching
+       the get_embedder singleton pattern."""
+    # To verify that all essential index files exist
+    essential_files = {
+        "FAISS Index": FAISS_INDEX_PATH,
+        "Chunk Metadata": METADATA_PATH,
+        "Article Lookup": ARTICLE_LOOKUP_PATH,
+    }
+    parents = {os.path.dirname(path) for path in essential_files.values()}
+    if len(parents) == 1:
+        # All three live in the same directory: one scandir replaces three
+        # stat calls, which matters at cold-start on network filesystems
+        try:
+            present = {entry.name for entry in os.scandir(parents.pop())}
+        except FileNotFoundError:
+            present = set()
+        missing_files = [name for name, path in essential_files.items()
+                         if os.path.basename(path) not in present]
+    else:
         missing_files = [name for name, path in essential_files.items()
                          if not os.path.exists(path)]
 
-        if missing_files:
-            logger.error(
-                "CRITICAL: Essential files missing: %s",
-                ", ".join(missing_files)
-            )
-            raise FileNotFoundError(
-                f"Missing essential data files: {', '.join(missing_files)}. "
-                "Run build_index.py before starting the RAG system."
-            )
-        else:
-            logger.info(
-                "All essential data files found. Proceeding with RAGSystem initialisation."
-            )
-            _rag_system_instance = RAGSystem()
+    if missing_files:
+        logger.error(
+            "CRITICAL: Essential files missing: %s",
+            ", ".join(missing_files)
+        )
+        raise FileNotFoundError(
+            f"Missing essential data files: {', '.join(missing_files)}. "
+            "Run build_index.py before starting the RAG system."
+        )
 
-    return _rag_system_instance
+    logger.info(
+        "All essential data files found. Proceeding with RAGSystem initialisation."
+    )
+    return RAGSystem()